@@ -2,7 +2,7 @@ import pygame
 import random
 import sys
 from settings import (SCREEN_WIDTH, SCREEN_HEIGHT, TITLE, FPS, BLACK, WHITE,
-                    RED, GREEN, CYAN, YELLOW, PLAYER_ACC, PLAYER_FRICTION,
+                    RED, GREEN, CYAN, YELLOW, SCALED_DISPLAY, PLAYER_ACC, PLAYER_FRICTION,
                     PLAYER_GRAV, PLAYER_JUMP, DASH_SPEED, DASH_DURATION,
                     DASH_COOLDOWN, KINETIC_BLAST_COST, ENERGY_REGEN,
                     ENEMY_SPAWN_RATE, ENEMY_SPEED, ENEMY_DAMAGE,
@@ -10,16 +10,25 @@ from settings import (SCREEN_WIDTH, SCREEN_HEIGHT, TITLE, FPS, BLACK, WHITE,
                     BOSS_HEALTH, BOSS_SPAWN_KILL_COUNT, DIFFICULTY_LEVELS, BOSS_HEALTH_BAR_COLOR)
 from sprites import (Player, Platform, GroundPatroller, FlyingDrone,
                      Boss, Projectile, SlamEffect, Spritesheet)
+from render import Renderer
+from snapshot import GameSnapshot
 from utils import resource_path
 
 class Game:
     def __init__(self):
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        flags = 0
+        if SCALED_DISPLAY and pygame.display.get_driver() != "dummy":
+            flags = pygame.SCALED | pygame.RESIZABLE
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags)
         pygame.display.set_caption(TITLE)
+        self.renderer = Renderer(self.screen)
         self.clock = pygame.time.Clock()
+        # Per-game RNG so independent games can be seeded separately
+        self.random = random.Random()
         self.running = True
         self.font_name = pygame.font.match_font('arial')
+        self.fonts = {}
         self.difficulty = "Medium"
         self.boss_incoming = False
         self.boss_incoming_timer = 0
@@ -32,6 +41,8 @@ class Game:
         self.groundenemy_spritesheet = Spritesheet("enemyground.png")
         self.boss_spritesheet = Spritesheet("bossvector.png")
         self.bullet_spritesheet = Spritesheet("bullet-fullsize.png")
+        # Shared Surfaces for sprites rebuilt from a GameSnapshot
+        self.image_cache = {}
         self.brick_wall_texture = pygame.image.load(resource_path("brick_wall.png")).convert_alpha()
         try:
             self.background_image = pygame.image.load(resource_path("background.png")).convert()
@@ -43,13 +54,22 @@ class Game:
         except (pygame.error, FileNotFoundError):
             self.sword_spritesheet = None
 
+    def ticks(self):
+        # Game time in ms; everything that runs on a timer reads it from here
+        return pygame.time.get_ticks()
+
     def new(self):
         # start a new game
+        self.setup()
+        self.run()
+
+    def setup(self):
+        # build the starting level without entering the game loop
         self.score = 0
         self.kill_count = 0
         self.game_won = False
-        self.last_enemy_spawn = pygame.time.get_ticks()
-        self.last_drone_spawn = pygame.time.get_ticks()
+        self.last_enemy_spawn = self.ticks()
+        self.last_drone_spawn = self.ticks()
         self.last_enemy_kill_time = 0
         self.all_sprites = pygame.sprite.Group()
         self.platforms = pygame.sprite.Group()
@@ -59,6 +79,7 @@ class Game:
         self.enemies = pygame.sprite.Group()
         self.scrollable_sprites = pygame.sprite.Group()
         self.platform_edges = []
+        self.quick_save = None
         self.player = Player(self)
         self.player.health = DIFFICULTY_LEVELS[self.difficulty]["PLAYER_HEALTH"]
         self.all_sprites.add(self.player)
@@ -80,8 +101,6 @@ class Game:
         self.enemies.add(enemy)
         self.scrollable_sprites.add(enemy)
 
-        self.run()
-
     def run(self):
         # Game Loop
         self.playing = True
@@ -90,6 +109,7 @@ class Game:
             self.events()
             self.update()
             self.draw()
+            self.renderer.adapt()
 
     def update(self):
         # Game Loop - Update
@@ -128,7 +148,7 @@ class Game:
                         self.playing = False
                 else:
                     hit.kill()
-                    self.last_enemy_kill_time = pygame.time.get_ticks()
+                    self.last_enemy_kill_time = self.ticks()
                     self.score += 10
                     self.kill_count += 1
                     if self.kill_count % BOSS_SPAWN_KILL_COUNT == 0:
@@ -167,7 +187,7 @@ class Game:
                             pass
 
         # Spawn new enemies
-        now = pygame.time.get_ticks()
+        now = self.ticks()
         num_ground_enemies = len([e for e in self.enemies if isinstance(e, GroundPatroller)])
         num_flying_enemies = len([e for e in self.enemies if isinstance(e, FlyingDrone)])
 
@@ -177,9 +197,9 @@ class Game:
            now - self.last_enemy_kill_time > ENEMY_RESPAWN_COOLDOWN:
             self.last_enemy_spawn = now
             if self.platforms:
-                platform = random.choice(list(self.platforms))
+                platform = self.random.choice(list(self.platforms))
                 if platform.rect.width > 0:
-                    x = random.randrange(platform.rect.left, platform.rect.right)
+                    x = self.random.randrange(platform.rect.left, platform.rect.right)
                     y = platform.rect.top - 30
                     enemy = GroundPatroller(x, y, self)
                     self.all_sprites.add(enemy)
@@ -190,8 +210,8 @@ class Game:
            num_flying_enemies < MAX_FLYING_ENEMIES and \
            now - self.last_enemy_kill_time > ENEMY_RESPAWN_COOLDOWN:
             self.last_drone_spawn = now
-            x = random.randrange(0, SCREEN_WIDTH)
-            y = random.randrange(0, 50)
+            x = self.random.randrange(0, SCREEN_WIDTH)
+            y = self.random.randrange(0, 50)
             drone = FlyingDrone(x, y, self)
             self.all_sprites.add(drone)
             self.enemies.add(drone)
@@ -200,9 +220,9 @@ class Game:
         # Procedural platform generation
         while len(self.platforms) < 10:
             last_platform = list(self.platforms)[-1]
-            width = random.randrange(50, 100)
-            p = Platform(last_platform.rect.right + random.randrange(50, 150),
-                         last_platform.rect.y + random.randrange(-50, 50),
+            width = self.random.randrange(50, 100)
+            p = Platform(last_platform.rect.right + self.random.randrange(50, 150),
+                         last_platform.rect.y + self.random.randrange(-50, 50),
                          width, 20, self.brick_wall_texture)
             if p.rect.top < 50:
                 p.rect.top = 50
@@ -228,6 +248,10 @@ class Game:
                     self.player.kinetic_blast()
                 if event.key == pygame.K_e:
                     self.player.melee_attack()
+                if event.key == pygame.K_F5:
+                    self.quick_save = GameSnapshot.capture(self)
+                if event.key == pygame.K_F9 and self.quick_save:
+                    self.quick_save.restore(self)
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left-click
                     self.player.kinetic_blast()
@@ -236,12 +260,13 @@ class Game:
 
     def draw(self):
         # Game Loop - draw
-        if self.background_image:
-            self.screen.blit(self.background_image, (0, 0))
+        self.renderer.draw_world(self.background_image, self.all_sprites)
+        if self.renderer.hud_native:
+            self.renderer.present()
+            self.draw_ui()
         else:
-            self.screen.fill(BLACK)
-        self.all_sprites.draw(self.screen)
-        self.draw_ui()
+            self.draw_ui()
+            self.renderer.present()
         # *after* drawing everything, flip the display
         pygame.display.flip()
 
@@ -250,37 +275,44 @@ class Game:
             return
         on_screen_platforms = [p for p in self.platforms if p.rect.right > 0 and p.rect.left < SCREEN_WIDTH and p.rect.width > 0]
         if on_screen_platforms:
-            platform = random.choice(on_screen_platforms)
-            x = random.randrange(platform.rect.left, platform.rect.right)
+            platform = self.random.choice(on_screen_platforms)
+            x = self.random.randrange(platform.rect.left, platform.rect.right)
             y = platform.rect.top - 150
             boss = Boss(x, y, self)
             self.all_sprites.add(boss)
             self.enemies.add(boss)
             self.scrollable_sprites.add(boss)
             self.boss_incoming = True
-            self.boss_incoming_timer = pygame.time.get_ticks()
+            self.boss_incoming_timer = self.ticks()
+
+    def get_font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(self.font_name, size)
+        return font
 
     def draw_ui(self):
-        # Draw the UI
-        font = pygame.font.Font(self.font_name, 24)
+        # Draw the UI, at native or internal resolution depending on the renderer
+        surface, s = self.renderer.hud_target()
+        font = self.get_font(round(24 * s))
         # Score
         score_text = font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
+        surface.blit(score_text, (10 * s, 10 * s))
         # Health Bar
         health_pct = self.player.health / DIFFICULTY_LEVELS[self.difficulty]["PLAYER_HEALTH"]
         if health_pct < 0:
             health_pct = 0
-        pygame.draw.rect(self.screen, RED, (10, 40, 100, 20))
-        pygame.draw.rect(self.screen, GREEN, (10, 40, 100 * health_pct, 20))
+        pygame.draw.rect(surface, RED, (10 * s, 40 * s, 100 * s, 20 * s))
+        pygame.draw.rect(surface, GREEN, (10 * s, 40 * s, 100 * health_pct * s, 20 * s))
         # Lives
         lives_text = font.render(f"Lives: {self.player.lives}", True, WHITE)
-        self.screen.blit(lives_text, (10, 70))
+        surface.blit(lives_text, (10 * s, 70 * s))
         # Energy
         energy_text = font.render(f"Energy: {self.player.energy}", True, CYAN)
-        self.screen.blit(energy_text, (10, 100))
+        surface.blit(energy_text, (10 * s, 100 * s))
         # Difficulty
         difficulty_text = font.render(f"Difficulty: {self.difficulty}", True, WHITE)
-        self.screen.blit(difficulty_text, (SCREEN_WIDTH - 150, 10))
+        surface.blit(difficulty_text, ((SCREEN_WIDTH - 150) * s, 10 * s))
 
         # Boss Health Bar
         boss = None
@@ -295,23 +327,24 @@ class Game:
             bar_height = 15
             bar_x = (SCREEN_WIDTH - bar_width) // 2
             bar_y = 50
-            pygame.draw.rect(self.screen, RED, (bar_x, bar_y, bar_width, bar_height))
-            pygame.draw.rect(self.screen, BOSS_HEALTH_BAR_COLOR, (bar_x, bar_y, bar_width * boss_health_pct, bar_height))
-            self.draw_text("Gordea", 24, WHITE, SCREEN_WIDTH // 2, bar_y + bar_height + 5)
+            pygame.draw.rect(surface, RED, (bar_x * s, bar_y * s, bar_width * s, bar_height * s))
+            pygame.draw.rect(surface, BOSS_HEALTH_BAR_COLOR,
+                             (bar_x * s, bar_y * s, bar_width * boss_health_pct * s, bar_height * s))
+            self.draw_text("Gordea", 24, WHITE, SCREEN_WIDTH // 2, bar_y + bar_height + 5, surface, s)
 
         if self.boss_incoming:
-            now = pygame.time.get_ticks()
+            now = self.ticks()
             if now - self.boss_incoming_timer < 2000:
-                self.draw_text("Boss Incoming!", 48, RED, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+                self.draw_text("Boss Incoming!", 48, RED, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, surface, s)
             else:
                 self.boss_incoming = False
 
-    def draw_text(self, text, size, color, x, y):
-        font = pygame.font.Font(self.font_name, size)
+    def draw_text(self, text, size, color, x, y, surface=None, scale=1):
+        font = self.get_font(round(size * scale))
         text_surface = font.render(text, True, color)
         text_rect = text_surface.get_rect()
-        text_rect.midtop = (x, y)
-        self.screen.blit(text_surface, text_rect)
+        text_rect.midtop = (round(x * scale), round(y * scale))
+        (surface or self.screen).blit(text_surface, text_rect)
 
     def show_start_screen(self):
         self.screen.fill(BLACK)
@@ -371,14 +404,15 @@ class Game:
         pygame.display.flip()
         self.wait_for_any_key()
 
-g = Game()
-while g.running:
-    g.show_start_screen()
-    g.new()
-    if g.game_won:
-        g.show_win_screen()
-    else:
-        g.show_go_screen()
-
-pygame.quit()
-sys.exit()
+if __name__ == "__main__":
+    g = Game()
+    while g.running:
+        g.show_start_screen()
+        g.new()
+        if g.game_won:
+            g.show_win_screen()
+        else:
+            g.show_go_screen()
+
+    pygame.quit()
+    sys.exit()
@@ -0,0 +1,124 @@
+import time
+import weakref
+import pygame
+from settings import (SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, RENDER_SCALE, RENDER_SCALES,
+                      RENDER_BUDGET_MS, ADAPTIVE_RENDER_SCALE, HUD_NATIVE_RESOLUTION)
+
+ADAPT_INTERVAL = 30  # frames measured before deciding on a scale change
+RETRY_INTERVAL = 600  # frames before a dropped scale is tried again
+
+
+class Renderer:
+    """ Draws the world into an internal-resolution surface and scales it up to the display """
+    def __init__(self, screen, scale=RENDER_SCALE, adaptive=ADAPTIVE_RENDER_SCALE,
+                 hud_native=HUD_NATIVE_RESOLUTION):
+        self.screen = screen
+        self.adaptive = adaptive
+        self.hud_native = hud_native
+        self.scales = sorted({s for s in RENDER_SCALES if s <= scale} | {scale}, reverse=True)
+        self.render_ms = 0
+        self.average_ms = None
+        self.costs = {}  # measured draw time per scale
+        self.blocked = set()  # lower scales that turned out no cheaper
+        self.reference_ms = None  # draw time when this scale was first measured
+        self.retry_interval = RETRY_INTERVAL
+        self.retrying = False
+        self.frames_at_scale = 0
+        self.scale = None
+        self.set_scale(scale)
+
+    def set_scale(self, scale):
+        if scale == self.scale:
+            return
+        self.scale = scale
+        self.average_ms = None
+        self.reference_ms = None
+        self.frames_at_scale = 0
+        # Scaled copies keyed by the original Surface; entries vanish with their sprite
+        self.images = weakref.WeakKeyDictionary()
+        self.background = None
+        if scale < 1:
+            self.world = pygame.Surface((round(SCREEN_WIDTH * scale), round(SCREEN_HEIGHT * scale)))
+        else:
+            self.world = self.screen
+
+    def scaled(self, image):
+        scaled = self.images.get(image)
+        if scaled is None:
+            width, height = image.get_size()
+            scaled = pygame.transform.scale(image, (max(1, round(width * self.scale)),
+                                                    max(1, round(height * self.scale))))
+            self.images[image] = scaled
+        return scaled
+
+    def draw_world(self, background, sprites):
+        start = time.perf_counter()
+        if background is None:
+            self.world.fill(BLACK)
+        elif self.scale < 1:
+            if self.background is None:
+                self.background = pygame.transform.scale(background, self.world.get_size())
+            self.world.blit(self.background, (0, 0))
+        else:
+            self.world.blit(background, (0, 0))
+
+        if self.scale < 1:
+            scale = self.scale
+            self.world.blits([(self.scaled(s.image), (int(s.rect.x * scale), int(s.rect.y * scale)))
+                              for s in sprites], doreturn=False)
+        else:
+            sprites.draw(self.world)
+        self.render_ms = (time.perf_counter() - start) * 1000
+
+    def hud_target(self):
+        # Surface and scale factor the HUD should be drawn with
+        if self.hud_native or self.scale == 1:
+            return self.screen, 1
+        return self.world, self.scale
+
+    def present(self):
+        if self.scale < 1:
+            start = time.perf_counter()
+            pygame.transform.scale(self.world, self.screen.get_size(), self.screen)
+            self.render_ms += (time.perf_counter() - start) * 1000
+
+    def adapt(self):
+        """ Pick the render scale from the time spent in draw_world and present.
+
+        Drops to the next scale while drawing runs over RENDER_BUDGET_MS, goes
+        back up if the lower scale turned out no cheaper, and retries a higher
+        scale only once its last cost, scaled by how much cheaper drawing has
+        become since, fits the budget. A retry that drops straight back down
+        doubles the wait before the next one.
+        """
+        if not self.adaptive:
+            return
+        if self.average_ms is None:
+            self.average_ms = self.render_ms
+        self.average_ms += (self.render_ms - self.average_ms) * 0.1
+        self.frames_at_scale += 1
+        if self.frames_at_scale % ADAPT_INTERVAL:
+            return
+        self.costs[self.scale] = self.average_ms
+        if self.reference_ms is None:
+            self.reference_ms = self.average_ms
+        retried, self.retrying = self.retrying, False
+        index = self.scales.index(self.scale)
+        higher = self.scales[index - 1] if index > 0 else None
+        if higher is not None and self.costs.get(higher, float("inf")) <= self.average_ms:
+            # Upscaling cost more than the smaller world saved
+            self.blocked.add(self.scale)
+            self.set_scale(higher)
+        elif self.average_ms > RENDER_BUDGET_MS:
+            lower = [s for s in self.scales[index + 1:] if s not in self.blocked]
+            if lower:
+                if retried:
+                    self.retry_interval *= 2
+                self.set_scale(lower[0])
+        elif retried:
+            self.retry_interval = RETRY_INTERVAL
+        elif higher is not None and self.frames_at_scale >= self.retry_interval:
+            expected_ms = self.costs[higher] * self.average_ms / self.reference_ms
+            if expected_ms <= RENDER_BUDGET_MS:
+                self.retrying = True
+                self.set_scale(higher)
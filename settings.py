@@ -4,6 +4,14 @@ SCREEN_HEIGHT = 600
 TITLE = "Infinite Platform Shooter"
 FPS = 60
 
+# Rendering
+SCALED_DISPLAY = True  # let SDL scale the window to any size
+RENDER_SCALE = 1.0  # internal world resolution relative to SCREEN_WIDTH x SCREEN_HEIGHT
+RENDER_SCALES = (1.0, 0.5)  # scales adaptive rendering may pick; whole ratios upscale cleanly
+RENDER_BUDGET_MS = 1000 / FPS / 2  # drawing gets half a frame, update and events the rest
+ADAPTIVE_RENDER_SCALE = True  # lower the internal resolution when drawing runs over budget
+HUD_NATIVE_RESOLUTION = True
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -0,0 +1,337 @@
+import random
+import pygame
+import numpy as np
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, YELLOW, GREEN, BOSS_MELEE_RESISTANCE
+from sprites import (Platform, GroundPatroller, FlyingDrone,
+                     Boss, Projectile, SlamEffect, Sword)
+
+# Column layouts of the per-entity arrays. Timers are stored relative to the
+# tick the snapshot was taken at, so a snapshot can be restored at any later
+# time and every cooldown resumes with the same amount of time left.
+PLAYER_FIELDS = ("pos_x", "pos_y", "vel_x", "vel_y", "acc_x", "acc_y",
+                 "rect_x", "rect_y", "lives", "health", "energy",
+                 "invulnerable", "last_hit_time", "facing")
+GAME_FIELDS = ("score", "kill_count", "game_won", "playing",
+               "last_enemy_spawn", "last_drone_spawn", "last_enemy_kill_time",
+               "boss_incoming", "boss_incoming_timer")
+PLATFORM_FIELDS = ("x", "y", "w", "h")
+GROUND_FIELDS = ("x", "y", "direction", "start_x", "speed", "patrol_range",
+                 "is_off_screen", "off_screen_timer")
+DRONE_FIELDS = ("x", "y", "shoot_delay", "last_shot",
+                "is_off_screen", "off_screen_timer")
+BOSS_FIELDS = ("x", "y", "health", "attack_delay", "last_attack",
+               "spiral_attack_cooldown", "last_spiral_attack", "slamming",
+               "is_off_screen", "off_screen_timer")
+PROJECTILE_FIELDS = ("x", "y", "vel_x", "vel_y")
+SWORD_FIELDS = ("x", "y", "spawn_time")
+EFFECT_FIELDS = ("spawn_time",)
+
+# Sprite kinds in GameSnapshot.order
+(PLAYER, PLATFORM, GROUND, DRONE, BOSS, PROJECTILE, ENEMY_PROJECTILE,
+ SWORD, EFFECT) = range(9)
+
+
+def _rows(rows, fields, dtype=np.float64):
+    if not rows:
+        return np.empty((0, len(fields)), dtype=dtype)
+    return np.array(rows, dtype=dtype)
+
+
+def _make(cls, image, x, y, rect_size=None):
+    # Build a sprite without running __init__, which would reload, retile or
+    # rotate its Surface. Images are shared through game.image_cache instead.
+    sprite = cls.__new__(cls)
+    pygame.sprite.Sprite.__init__(sprite)
+    sprite.image = image
+    if rect_size is None:
+        rect_size = image.get_size()
+    sprite.rect = pygame.Rect(int(x), int(y), *rect_size)
+    return sprite
+
+
+def _cached(game, key, build):
+    image = game.image_cache.get(key)
+    if image is None:
+        image = game.image_cache[key] = build()
+    return image
+
+
+class GameSnapshot:
+    """ Plain numeric copy of a running Game, without any Surfaces """
+    __slots__ = ("game", "player", "platforms", "platform_edges", "ground",
+                 "drones", "bosses", "projectiles", "enemy_projectiles",
+                 "swords", "effects", "order", "frame", "rng")
+
+    @classmethod
+    def capture(cls, game):
+        now = game.ticks()
+        snap = cls.__new__(cls)
+        p = game.player
+        snap.player = np.array([
+            p.pos.x, p.pos.y, p.vel.x, p.vel.y, p.acc.x, p.acc.y,
+            p.rect.x, p.rect.y, p.lives, p.health, p.energy,
+            p.invulnerable, p.last_hit_time - now,
+            1 if p.last_direction == "right" else -1,
+        ], dtype=np.float64)
+        snap.game = np.array([
+            game.score, game.kill_count, game.game_won,
+            getattr(game, "playing", True),
+            game.last_enemy_spawn - now, game.last_drone_spawn - now,
+            game.last_enemy_kill_time - now,
+            game.boss_incoming, game.boss_incoming_timer - now,
+        ], dtype=np.float64)
+
+        # One pass over all_sprites so each kind's rows, and the order array
+        # that interleaves them, keep the original draw and update order
+        order, platforms, ground, drones, bosses = [], [], [], [], []
+        projectiles, enemy_projectiles, swords, effects = [], [], [], []
+        for s in game.all_sprites:
+            if isinstance(s, Platform):
+                order.append(PLATFORM)
+                platforms.append((s.rect.x, s.rect.y, s.rect.width, s.rect.height))
+            elif isinstance(s, GroundPatroller):
+                order.append(GROUND)
+                ground.append((s.rect.x, s.rect.y, s.direction, s.start_x, s.speed,
+                               s.patrol_range, s.is_off_screen, s.off_screen_timer - now))
+            elif isinstance(s, FlyingDrone):
+                order.append(DRONE)
+                drones.append((s.rect.x, s.rect.y, s.shoot_delay, s.last_shot - now,
+                               s.is_off_screen, s.off_screen_timer - now))
+            elif isinstance(s, Boss):
+                order.append(BOSS)
+                bosses.append((s.rect.x, s.rect.y, s.health, s.attack_delay,
+                               s.last_attack - now, s.spiral_attack_cooldown,
+                               s.last_spiral_attack - now, s.slamming,
+                               s.is_off_screen, s.off_screen_timer - now))
+            elif isinstance(s, Projectile):
+                if s in game.projectiles:
+                    order.append(PROJECTILE)
+                    projectiles.append((s.rect.x, s.rect.y, s.vel.x, s.vel.y))
+                else:
+                    order.append(ENEMY_PROJECTILE)
+                    enemy_projectiles.append((s.rect.x, s.rect.y, s.vel.x, s.vel.y))
+            elif isinstance(s, Sword):
+                order.append(SWORD)
+                swords.append((s.rect.x, s.rect.y, s.spawn_time - now))
+            elif isinstance(s, SlamEffect):
+                order.append(EFFECT)
+                effects.append((s.spawn_time - now,))
+            elif s is game.player:
+                order.append(PLAYER)
+            else:
+                raise TypeError(f"GameSnapshot cannot capture {type(s).__name__} sprites")
+        snap.order = np.array(order, dtype=np.int8)
+        snap.platforms = _rows(platforms, PLATFORM_FIELDS, np.int64)
+        snap.platform_edges = np.array(game.platform_edges, dtype=np.int64)
+        snap.ground = _rows(ground, GROUND_FIELDS)
+        snap.drones = _rows(drones, DRONE_FIELDS)
+        snap.bosses = _rows(bosses, BOSS_FIELDS)
+        snap.projectiles = _rows(projectiles, PROJECTILE_FIELDS)
+        snap.enemy_projectiles = _rows(enemy_projectiles, PROJECTILE_FIELDS)
+        snap.swords = _rows(swords, SWORD_FIELDS)
+        snap.effects = _rows(effects, EFFECT_FIELDS)
+        # Headless games run on a frame counter; rewinding it keeps every timer exact
+        snap.frame = getattr(game, "frame", None)
+
+        version, internal, gauss = game.random.getstate()
+        snap.rng = (version, np.array(internal, dtype=np.uint32), gauss)
+        return snap
+
+    def differences(self, other):
+        """ Names of the fields that differ between two snapshots """
+        return [name for name in self.__slots__
+                if name != "rng" and not np.array_equal(getattr(self, name), getattr(other, name))
+                or name == "rng" and not (self.rng[0] == other.rng[0] and self.rng[2] == other.rng[2]
+                                          and np.array_equal(self.rng[1], other.rng[1]))]
+
+    def restore(self, game):
+        if self.frame is not None:
+            game.frame = self.frame
+        now = game.ticks()
+
+        # Detach the player first so it does not keep the old Groups alive
+        p = game.player
+        p.kill()
+        (pos_x, pos_y, vel_x, vel_y, acc_x, acc_y, rect_x, rect_y, lives, health,
+         energy, invulnerable, last_hit_time, facing) = self.player.tolist()
+        p.pos = pygame.math.Vector2(pos_x, pos_y)
+        p.vel = pygame.math.Vector2(vel_x, vel_y)
+        p.acc = pygame.math.Vector2(acc_x, acc_y)
+        p.rect.topleft = (int(rect_x), int(rect_y))
+        p.lives = int(lives)
+        p.health = int(health)
+        p.energy = energy
+        p.invulnerable = bool(invulnerable)
+        p.last_hit_time = now + int(last_hit_time)
+        p.last_direction = "right" if facing > 0 else "left"
+        if p.last_direction == "left":
+            p.image = p.flipped_image
+        else:
+            p.image = p.original_image
+
+        (score, kill_count, game_won, playing, last_enemy_spawn, last_drone_spawn,
+         last_enemy_kill_time, boss_incoming, boss_incoming_timer) = self.game.tolist()
+        game.score = int(score)
+        game.kill_count = int(kill_count)
+        game.game_won = bool(game_won)
+        game.playing = bool(playing)
+        game.last_enemy_spawn = now + int(last_enemy_spawn)
+        game.last_drone_spawn = now + int(last_drone_spawn)
+        game.last_enemy_kill_time = now + int(last_enemy_kill_time)
+        game.boss_incoming = bool(boss_incoming)
+        game.boss_incoming_timer = now + int(boss_incoming_timer)
+
+        platforms = []
+        for x, y, w, h in self.platforms.tolist():
+            image = _cached(game, ("platform", w, h),
+                            lambda: Platform(0, 0, w, h, game.brick_wall_texture).image)
+            platforms.append(_make(Platform, image, x, y))
+
+        ground, drones, bosses = [], [], []
+        ground_image = _cached(game, ("ground",), lambda: game.groundenemy_spritesheet.get_image(0, 0, 32, 32))
+        for x, y, direction, start_x, speed, patrol_range, off, off_timer in self.ground.tolist():
+            e = _make(GroundPatroller, ground_image, x, y)
+            e.game = game
+            e.sprite_coords = (0, 0, 32, 32)
+            e.direction = int(direction)
+            e.start_x = start_x
+            e.speed = int(speed)
+            e.patrol_range = int(patrol_range)
+            e.is_off_screen = bool(off)
+            e.off_screen_timer = now + int(off_timer)
+            ground.append(e)
+        for x, y, shoot_delay, last_shot, off, off_timer in self.drones.tolist():
+            e = _make(FlyingDrone, game.drone_spritesheet.spritesheet, x, y)
+            e.game = game
+            e.sprite_coords = (0, 0, 32, 32)
+            e.shoot_delay = int(shoot_delay)
+            e.last_shot = now + int(last_shot)
+            e.is_off_screen = bool(off)
+            e.off_screen_timer = now + int(off_timer)
+            drones.append(e)
+        for (x, y, health, attack_delay, last_attack, spiral_cooldown,
+             last_spiral, slamming, off, off_timer) in self.bosses.tolist():
+            e = _make(Boss, game.boss_spritesheet.spritesheet, x, y)
+            e.game = game
+            e.health = int(health)
+            e.melee_resistance = BOSS_MELEE_RESISTANCE
+            e.attack_delay = int(attack_delay)
+            e.last_attack = now + int(last_attack)
+            e.spiral_attack_cooldown = int(spiral_cooldown)
+            e.last_spiral_attack = now + int(last_spiral)
+            e.slamming = bool(slamming)
+            e.is_off_screen = bool(off)
+            e.off_screen_timer = now + int(off_timer)
+            bosses.append(e)
+
+        bullet = game.bullet_spritesheet.spritesheet
+        bullet_size = bullet.get_size()
+
+        def projectiles(rows):
+            built = []
+            for x, y, vel_x, vel_y in rows.tolist():
+                vel = pygame.math.Vector2(vel_x, vel_y)
+                angle = -vel.angle_to(pygame.math.Vector2(0, -1))
+                image = _cached(game, ("projectile", round(angle, 3)),
+                                lambda: pygame.transform.rotate(bullet, angle))
+                s = _make(Projectile, image, x, y, bullet_size)
+                s.game = game
+                s.vel = vel
+                built.append(s)
+            return built
+
+        player_projectiles = projectiles(self.projectiles)
+        enemy_projectiles = projectiles(self.enemy_projectiles)
+
+        swords = []
+        for x, y, spawn_time in self.swords.tolist():
+            if game.sword_spritesheet:
+                image = game.sword_spritesheet.spritesheet
+            else:
+                image = _cached(game, ("sword",), lambda: _filled((64, 32), GREEN, pygame.SRCALPHA))
+            s = _make(Sword, image, x, y)
+            s.player = p
+            s.spawn_time = now + int(spawn_time)
+            swords.append(s)
+
+        effects = []
+        slam_image = _cached(game, ("slam",), lambda: _filled((SCREEN_WIDTH, 50), YELLOW))
+        for (spawn_time,) in self.effects.tolist():
+            s = _make(SlamEffect, slam_image, 0, 0)
+            s.game = game
+            s.rect.bottomleft = (0, SCREEN_HEIGHT)
+            s.spawn_time = now + int(spawn_time)
+            effects.append(s)
+
+        # Interleave the rebuilt sprites back into their captured order
+        built = {PLAYER: iter((p,)), PLATFORM: iter(platforms), GROUND: iter(ground),
+                 DRONE: iter(drones), BOSS: iter(bosses), PROJECTILE: iter(player_projectiles),
+                 ENEMY_PROJECTILE: iter(enemy_projectiles), SWORD: iter(swords),
+                 EFFECT: iter(effects)}
+        kinds = self.order.tolist()
+        ordered = [next(built[kind]) for kind in kinds]
+        enemies = [s for s, kind in zip(ordered, kinds) if kind in (GROUND, DRONE, BOSS)]
+        game.all_sprites = pygame.sprite.Group(*ordered)
+        game.platforms = pygame.sprite.Group(*platforms)
+        game.enemies = pygame.sprite.Group(*enemies)
+        game.scrollable_sprites = pygame.sprite.Group(*[s for s, kind in zip(ordered, kinds)
+                                                        if kind in (PLATFORM, GROUND, DRONE, BOSS)])
+        game.projectiles = pygame.sprite.Group(*player_projectiles)
+        game.enemy_projectiles = pygame.sprite.Group(*enemy_projectiles)
+        game.effects = pygame.sprite.Group(*effects)
+        game.platform_edges = self.platform_edges.tolist()
+
+        version, internal, gauss = self.rng
+        game.random.setstate((version, tuple(internal.tolist()), gauss))
+
+
+def _filled(size, color, flags=0):
+    image = pygame.Surface(size, flags)
+    image.fill(color)
+    return image
+
+
+def round_trip_differences(game, inputs):
+    """ Capture, play inputs, restore, play them again and compare the results.
+
+    game must be stepped deterministically, e.g. a vec_env.HeadlessGame;
+    inputs is a list of (move, jump, kinetic_blast, melee_attack) tuples.
+    """
+    start = GameSnapshot.capture(game)
+    for action in inputs:
+        game.step(*action)
+    first = GameSnapshot.capture(game)
+    start.restore(game)
+    for action in inputs:
+        game.step(*action)
+    return first.differences(GameSnapshot.capture(game))
+
+
+if __name__ == "__main__":
+    import argparse
+    from vec_env import HeadlessGame
+
+    parser = argparse.ArgumentParser(description="Check that restoring a snapshot replays exactly")
+    parser.add_argument("--seeds", type=int, default=40)
+    parser.add_argument("--warmup", type=int, default=300, help="frames played before capturing")
+    parser.add_argument("--frames", type=int, default=120, help="frames replayed after restoring")
+    args = parser.parse_args()
+
+    game = HeadlessGame()
+    failures = 0
+    for seed in range(args.seeds):
+        game.random.seed(seed)
+        game.frame = 0
+        game.setup()
+        bot = random.Random(seed)
+        # Biased to the right so the screen scrolls and patrol bounds move
+        inputs = [(bot.choice((-1, 0, 1, 1)), bot.random() < 0.05, bot.random() < 0.02, bot.random() < 0.02)
+                  for _ in range(args.warmup + args.frames)]
+        for action in inputs[:args.warmup]:
+            game.step(*action)
+        differences = round_trip_differences(game, inputs[args.warmup:])
+        if differences:
+            failures += 1
+            print(f"seed {seed}: replay differs in {', '.join(differences)}")
+    print(f"{args.seeds - failures}/{args.seeds} seeds replayed exactly")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,201 @@
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+import numpy as np
+import pygame
+from settings import FPS
+from vec_env import HeadlessGame
+
+GROUPS = ("all_sprites", "platforms", "enemies", "scrollable_sprites",
+          "projectiles", "enemy_projectiles", "effects")
+WINDOWS = 8        # growth check compares the minimum of each window of samples
+TOLERANCE = 0.05   # last window minimum must beat the first by this much
+
+
+def is_growing(values, windows=WINDOWS, tolerance=TOLERANCE):
+    """ True if the floor of a series keeps rising from window to window.
+
+    Comparing window minimums ignores the normal sawtooth of entities being
+    spawned and killed and only flags a baseline that never comes back down.
+    The floor must still be rising in the second half, so a count that ramps
+    up to a cap (enemies after a reset) is not reported.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[len(values) // 10:]  # skip warm-up
+    if len(values) < windows * 2:
+        return False
+    mins = [chunk.min() for chunk in np.array_split(values, windows)]
+    rising = all(b >= a for a, b in zip(mins, mins[1:]))
+    still_rising = mins[-1] > mins[windows // 2]
+    return rising and still_rising and mins[-1] - mins[0] >= max(1, abs(mins[0]) * tolerance)
+
+
+def _take_snapshot():
+    # Leave out the monitor's own bookkeeping, which grows with every sample
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+
+
+def count_surfaces():
+    """ Number of live pygame Surfaces, wherever they are referenced from.
+
+    Surfaces are not tracked by gc, and neither are dicts and tuples that hold
+    only untracked objects (an image cache keyed by tuples of strings and ints).
+    So walk from every tracked object down through dicts and tuples, tracked or
+    not, and collect the Surfaces found on the way.
+    """
+    gc.collect()  # sprites and Groups reference each other, so dead ones wait for a collection
+    surfaces = set()
+    seen = set()
+    for obj in gc.get_objects():
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        stack = list(gc.get_referents(obj))
+        while stack:
+            ref = stack.pop()
+            if isinstance(ref, pygame.Surface):
+                surfaces.add(id(ref))
+            elif isinstance(ref, (dict, tuple)) and id(ref) not in seen:
+                seen.add(id(ref))
+                stack.extend(gc.get_referents(ref))
+    return len(surfaces)
+
+
+class SoakMonitor:
+    """ Samples memory and entity counts of a Game and flags steady growth.
+
+    Tracing starts when the monitor is created; take the first sample only
+    after a warm-up so the baseline already includes normal sprite churn.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.samples = []
+        self.sessions = []  # session index of each sample
+        self.session = 0
+        self.first_snapshot = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def new_session(self):
+        # Called when the game is reset, which empties every Group
+        self.session += 1
+
+    def sample(self, seconds):
+        game = self.game
+        snapshot = _take_snapshot()
+        row = {"seconds": seconds,
+               "traced_kb": sum(stat.size for stat in snapshot.statistics("filename")) / 1024}
+        for name in GROUPS:
+            row[name] = len(getattr(game, name))
+        row["platform_edges"] = len(game.platform_edges)
+        row["surfaces"] = count_surfaces()
+        row["cached_images"] = len(game.image_cache)
+        row["fonts"] = len(game.fonts)
+        self.samples.append(row)
+        self.sessions.append(self.session)
+        if self.first_snapshot is None:
+            self.first_snapshot = snapshot
+        return row
+
+    def metrics(self):
+        return [name for name in self.samples[0] if name != "seconds"] if self.samples else []
+
+    def series(self, name, session=None):
+        return [row[name] for row, s in zip(self.samples, self.sessions) if session is None or s == session]
+
+    def growing(self):
+        # A metric is flagged if it grows over the whole run or within any single game,
+        # since a reset wipes per-game state such as Groups and platform_edges
+        flagged = []
+        for name in self.metrics():
+            if is_growing(self.series(name)) or any(
+                    is_growing(self.series(name, session)) for session in range(self.session + 1)):
+                flagged.append(name)
+        return flagged
+
+    def write_report(self, path, top=10):
+        # Snapshot before the growth checks below allocate anything
+        last_snapshot = _take_snapshot()
+        lines = ["Soak report", "=" * 11, ""]
+        if self.samples:
+            lines.append(f"Samples: {len(self.samples)} over {self.samples[-1]['seconds'] / 60:.1f} game minutes")
+            lines.append(f"Game resets: {self.session}")
+            lines.append("")
+            lines.append(f"{'metric':<20}{'first':>12}{'min':>12}{'max':>12}{'last':>12}")
+            for name in self.metrics():
+                values = self.series(name)
+                lines.append(f"{name:<20}{values[0]:>12.0f}{min(values):>12.0f}{max(values):>12.0f}{values[-1]:>12.0f}")
+            lines.append("")
+            lines.append("Peak per game:")
+            lines.append(f"{'metric':<20}" + "".join(f"{'game ' + str(s + 1):>10}" for s in range(self.session + 1)))
+            for name in self.metrics():
+                peaks = [max(self.series(name, s), default=0) for s in range(self.session + 1)]
+                lines.append(f"{name:<20}" + "".join(f"{peak:>10.0f}" for peak in peaks))
+            lines.append("")
+        flagged = self.growing()
+        if flagged:
+            lines.append("Monotonic growth detected in: " + ", ".join(flagged))
+        else:
+            lines.append("No monotonic growth detected")
+        if self.first_snapshot is not None:
+            stats = last_snapshot.compare_to(self.first_snapshot, "lineno")
+            lines.append("")
+            lines.append(f"Top {top} allocation sites by growth:")
+            lines.extend(f"  {stat}" for stat in stats[:top])
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return flagged
+
+
+def run_soak(hours, sample_every, report, draw=False, difficulty="Medium", seed=0, warmup=60):
+    """ Play one long headless session with random inputs for `hours` of game time.
+
+    Lives are refilled so the session never ends, like a kiosk that keeps
+    one game running; if the game ends anyway it is reset and counted.
+    """
+    game = HeadlessGame(difficulty)
+    game.random.seed(seed)
+    game.setup()
+    full_lives = game.player.lives
+    monitor = SoakMonitor(game)
+    bot = random.Random(seed)
+    warmup_frames = int(warmup * FPS)
+    frames = warmup_frames + int(hours * 3600 * FPS)
+    sample_frames = max(1, int(sample_every * FPS))
+    started = time.perf_counter()
+    for frame in range(frames):
+        game.step(bot.choice((-1, 0, 1)), bot.random() < 0.05,
+                  bot.random() < 0.02, bot.random() < 0.02)
+        if draw:
+            game.draw()
+        if game.player.lives < full_lives:
+            game.player.lives = full_lives
+        if not game.playing:
+            game.setup()
+            monitor.new_session()
+        if frame >= warmup_frames and (frame - warmup_frames) % sample_frames == 0:
+            monitor.sample((frame - warmup_frames) / FPS)
+    monitor.sample((frames - warmup_frames) / FPS)
+    flagged = monitor.write_report(report)
+    print(f"Soaked {hours} game hours in {time.perf_counter() - started:.0f}s, report written to {report}")
+    if flagged:
+        print("Monotonic growth detected in: " + ", ".join(flagged))
+    return flagged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a long headless session and look for leaks")
+    parser.add_argument("--hours", type=float, default=4, help="game hours to simulate")
+    parser.add_argument("--sample-every", type=float, default=60, help="game seconds between samples")
+    parser.add_argument("--warmup", type=float, default=60, help="game seconds played before the first sample")
+    parser.add_argument("--report", default="soak_report.txt")
+    parser.add_argument("--draw", action="store_true", help="also render every frame")
+    parser.add_argument("--difficulty", default="Medium", choices=("Easy", "Medium", "Hard"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run_soak(args.hours, args.sample_every, args.report, args.draw, args.difficulty, args.seed, args.warmup)
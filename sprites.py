@@ -1,5 +1,4 @@
 import pygame
-import random
 from settings import *
 from utils import resource_path
 
@@ -17,6 +16,7 @@ class Player(pygame.sprite.Sprite):
         super().__init__()
         self.game = game
         self.original_image = self.game.spritesheet.spritesheet
+        self.flipped_image = pygame.transform.flip(self.original_image, True, False)
         self.image = self.original_image
         self.rect = self.image.get_rect()
         self.rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
@@ -30,24 +30,30 @@ class Player(pygame.sprite.Sprite):
         self.invulnerability_duration = 500  # ms
         self.last_hit_time = 0
         self.last_direction = "right"
+        # -1/0/1 horizontal input set by a bot; None reads the keyboard
+        self.move_input = None
 
     def update(self):
-        if self.invulnerable and pygame.time.get_ticks() - self.last_hit_time > self.invulnerability_duration:
+        if self.invulnerable and self.game.ticks() - self.last_hit_time > self.invulnerability_duration:
             self.invulnerable = False
 
         self.energy = min(100, self.energy + ENERGY_REGEN)
 
         self.acc = pygame.math.Vector2(0, PLAYER_GRAV)
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_a]:
+        if self.move_input is None:
+            keys = pygame.key.get_pressed()
+            move_left, move_right = keys[pygame.K_a], keys[pygame.K_d]
+        else:
+            move_left, move_right = self.move_input < 0, self.move_input > 0
+        if move_left:
             self.acc.x = -PLAYER_ACC
             self.last_direction = "left"
-        if keys[pygame.K_d]:
+        if move_right:
             self.acc.x = PLAYER_ACC
             self.last_direction = "right"
 
         if self.last_direction == "left":
-            self.image = pygame.transform.flip(self.original_image, True, False)
+            self.image = self.flipped_image
         else:
             self.image = self.original_image
 
@@ -108,7 +114,7 @@ class Player(pygame.sprite.Sprite):
                 else:
                     self.game.playing = False
             self.invulnerable = True
-            self.last_hit_time = pygame.time.get_ticks()
+            self.last_hit_time = self.game.ticks()
 
 class Sword(pygame.sprite.Sprite):
     def __init__(self, player):
@@ -125,10 +131,10 @@ class Sword(pygame.sprite.Sprite):
         else:
             self.rect.right = self.player.rect.left
         self.rect.centery = self.player.rect.centery
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = self.player.game.ticks()
 
     def update(self):
-        if pygame.time.get_ticks() - self.spawn_time > 100:
+        if self.player.game.ticks() - self.spawn_time > 100:
             self.kill()
 
 class Platform(pygame.sprite.Sprite):
@@ -153,8 +159,8 @@ class Enemy(pygame.sprite.Sprite):
         if self.rect.right < 0 or self.rect.left > SCREEN_WIDTH:
             if not self.is_off_screen:
                 self.is_off_screen = True
-                self.off_screen_timer = pygame.time.get_ticks()
-            elif pygame.time.get_ticks() - self.off_screen_timer > 3000:
+                self.off_screen_timer = self.game.ticks()
+            elif self.game.ticks() - self.off_screen_timer > 3000:
                 self.kill()
         else:
             self.is_off_screen = False
@@ -187,11 +193,11 @@ class FlyingDrone(Enemy):
         self.rect = self.image.get_rect()
         self.rect.topleft = (x, y)
         self.shoot_delay = 1000
-        self.last_shot = pygame.time.get_ticks()
+        self.last_shot = self.game.ticks()
 
     def update(self):
         super().update()
-        now = pygame.time.get_ticks()
+        now = self.game.ticks()
         if now - self.last_shot > self.shoot_delay:
             self.last_shot = now
             vel = pygame.math.Vector2(0, PROJECTILE_SPEED)
@@ -200,15 +206,16 @@ class FlyingDrone(Enemy):
             self.game.enemy_projectiles.add(projectile)
 
 class SlamEffect(pygame.sprite.Sprite):
-    def __init__(self):
+    def __init__(self, game):
         super().__init__()
+        self.game = game
         self.image = pygame.Surface((SCREEN_WIDTH, 50))
         self.image.fill(YELLOW)
         self.rect = self.image.get_rect(bottomleft=(0, SCREEN_HEIGHT))
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = self.game.ticks()
 
     def update(self):
-        if pygame.time.get_ticks() - self.spawn_time > 200:
+        if self.game.ticks() - self.spawn_time > 200:
             self.kill()
 
 class Projectile(pygame.sprite.Sprite):
@@ -242,21 +249,21 @@ class Boss(Enemy):
         self.health = BOSS_HEALTH
         self.melee_resistance = BOSS_MELEE_RESISTANCE
         self.attack_delay = 2000
-        self.last_attack = pygame.time.get_ticks()
+        self.last_attack = self.game.ticks()
         self.spiral_attack_cooldown = 5000
         self.last_spiral_attack = 0
         self.slamming = False
 
     def update(self):
         super().update()
-        now = pygame.time.get_ticks()
+        now = self.game.ticks()
         if now - self.last_attack > self.attack_delay:
             self.last_attack = now
             if self.health < BOSS_HEALTH / 2 and now - self.last_spiral_attack > self.spiral_attack_cooldown:
                 self.spiral_attack()
                 self.last_spiral_attack = now
             else:
-                attack_type = random.choice(["slam", "volley"])
+                attack_type = self.game.random.choice(["slam", "volley"])
                 if attack_type == "slam":
                     self.ground_slam()
                 else:
@@ -264,7 +271,7 @@ class Boss(Enemy):
 
     def ground_slam(self):
         self.slamming = True
-        effect = SlamEffect()
+        effect = SlamEffect(self.game)
         self.game.effects.add(effect)
         self.game.all_sprites.add(effect)
         if self.game.player.rect.bottom > SCREEN_HEIGHT - 50:
@@ -272,7 +279,7 @@ class Boss(Enemy):
 
     def projectile_volley(self):
         for i in range(5):
-            vel = pygame.math.Vector2(random.randint(-5, 5), random.randint(3, 8)).normalize() * PROJECTILE_SPEED
+            vel = pygame.math.Vector2(self.game.random.randint(-5, 5), self.game.random.randint(3, 8)).normalize() * PROJECTILE_SPEED
             projectile = Projectile(self.game, self.rect.centerx, self.rect.bottom, vel)
             self.game.all_sprites.add(projectile)
             self.game.enemy_projectiles.add(projectile)
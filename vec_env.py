@@ -0,0 +1,160 @@
+import os
+
+# Environments never open a visible window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import numpy as np
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, DIFFICULTY_LEVELS
+from sprites import GroundPatroller, FlyingDrone, Boss
+from main import Game
+
+# Action columns: move (-1 left, 0 none, 1 right), jump, kinetic_blast, melee_attack
+ACTION_SIZE = 4
+NEAREST = 4  # enemies, enemy projectiles and platforms reported per observation
+PLAYER_FEATURES = 8
+ENEMY_FEATURES = 4
+PROJECTILE_FEATURES = 3
+PLATFORM_FEATURES = 4
+OBS_SIZE = (PLAYER_FEATURES + NEAREST * (ENEMY_FEATURES + PROJECTILE_FEATURES
+                                         + PLATFORM_FEATURES))
+FRAME_MS = 1000 / FPS
+
+ENEMY_KINDS = {GroundPatroller: 1, FlyingDrone: 2, Boss: 3}
+
+
+class HeadlessGame(Game):
+    """ Game driven one frame at a time on its own clock, with no drawing """
+    def __init__(self, difficulty="Medium"):
+        super().__init__()
+        self.difficulty = difficulty
+        self.frame = 0
+
+    def ticks(self):
+        return int(self.frame * FRAME_MS)
+
+    def setup(self):
+        super().setup()
+        self.playing = True
+        self.player.move_input = 0
+
+    def step(self, move, jump, blast, melee):
+        # Apply one frame of bot input and advance the game
+        player = self.player
+        player.move_input = move
+        if jump:
+            player.jump()
+        if blast:
+            player.kinetic_blast()
+        if melee:
+            player.melee_attack()
+        self.frame += 1
+        self.update()
+
+
+class VecGameEnv:
+    """ N independent games stepped together with a Gym-style reset()/step() """
+    def __init__(self, num_envs, difficulty="Medium", max_steps=None):
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+        self.games = [HeadlessGame(difficulty) for _ in range(num_envs)]
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.obs = np.zeros((num_envs, OBS_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+        self.kill_counts = np.zeros(num_envs, dtype=np.int64)
+        self.final_scores = np.zeros(num_envs, dtype=np.int64)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+
+    def reset(self, seed=None):
+        """ Start a new episode in every game; game i is seeded with seed + i """
+        for i, game in enumerate(self.games):
+            if seed is not None:
+                game.random.seed(seed + i)
+            self._reset_env(i)
+        return self.obs.copy()
+
+    def step(self, actions):
+        """ Advance every game by one frame.
+
+        actions is an (N, 4) array of move, jump, kinetic_blast, melee_attack.
+        Returns observations, rewards (score gained this step), done flags and an
+        info dict. Finished games are reset straight away, so the observation of
+        a done env is the first one of its next episode.
+        """
+        actions = np.asarray(actions).reshape(self.num_envs, ACTION_SIZE).tolist()
+        self.steps += 1
+        for i, (game, action) in enumerate(zip(self.games, actions)):
+            game.step(*action)
+
+            self.rewards[i] = game.score - self.scores[i]
+            self.scores[i] = game.score
+            self.kill_counts[i] = game.kill_count
+            truncated = game.playing and self.max_steps is not None and self.steps[i] >= self.max_steps
+            done = not game.playing or truncated
+            self.dones[i] = done
+            self.truncated[i] = truncated
+            if done:
+                self.final_scores[i] = game.score
+                self._reset_env(i)
+            else:
+                self._observe(i)
+        # Keep the shared event queue from filling up while nothing reads it
+        pygame.event.pump()
+        # final_score is only meaningful where done is set; score and kill_count
+        # of a finished env already belong to its new episode. truncated marks
+        # episodes cut off by max_steps rather than ended by the game.
+        info = {"score": self.scores.copy(), "kill_count": self.kill_counts.copy(),
+                "final_score": self.final_scores.copy(), "truncated": self.truncated.copy()}
+        return self.obs.copy(), self.rewards.copy(), self.dones.copy(), info
+
+    def close(self):
+        self.games = []
+
+    def _reset_env(self, i):
+        game = self.games[i]
+        game.frame = 0
+        game.setup()
+        self.steps[i] = 0
+        self.scores[i] = game.score
+        self.kill_counts[i] = game.kill_count
+        self._observe(i)
+
+    def _observe(self, i):
+        game = self.games[i]
+        player = game.player
+        px, py = player.pos.x, player.pos.y
+        row = self.obs[i]
+        row[:] = 0
+        row[:PLAYER_FEATURES] = (
+            px / SCREEN_WIDTH, py / SCREEN_HEIGHT, player.vel.x, player.vel.y,
+            player.health / DIFFICULTY_LEVELS[game.difficulty]["PLAYER_HEALTH"],
+            player.energy / 100, player.lives, player.invulnerable,
+        )
+        offset = PLAYER_FEATURES
+
+        enemies = sorted(((e.rect.centerx - px) ** 2 + (e.rect.centery - py) ** 2,
+                          e.rect.centerx, e.rect.centery, ENEMY_KINDS.get(type(e), 0))
+                         for e in game.enemies)[:NEAREST]
+        for j, (_, x, y, kind) in enumerate(enemies):
+            k = offset + j * ENEMY_FEATURES
+            row[k:k + ENEMY_FEATURES] = ((x - px) / SCREEN_WIDTH, (y - py) / SCREEN_HEIGHT, kind, 1)
+        offset += NEAREST * ENEMY_FEATURES
+
+        projectiles = sorted(((s.rect.centerx - px) ** 2 + (s.rect.centery - py) ** 2,
+                              s.rect.centerx, s.rect.centery)
+                             for s in game.enemy_projectiles)[:NEAREST]
+        for j, (_, x, y) in enumerate(projectiles):
+            k = offset + j * PROJECTILE_FEATURES
+            row[k:k + PROJECTILE_FEATURES] = ((x - px) / SCREEN_WIDTH, (y - py) / SCREEN_HEIGHT, 1)
+        offset += NEAREST * PROJECTILE_FEATURES
+
+        platforms = sorted(((p.rect.centerx - px) ** 2 + (p.rect.top - py) ** 2,
+                            p.rect.centerx, p.rect.top, p.rect.width)
+                           for p in game.platforms)[:NEAREST]
+        for j, (_, x, y, w) in enumerate(platforms):
+            k = offset + j * PLATFORM_FEATURES
+            row[k:k + PLATFORM_FEATURES] = ((x - px) / SCREEN_WIDTH, (y - py) / SCREEN_HEIGHT,
+                                            w / SCREEN_WIDTH, 1)